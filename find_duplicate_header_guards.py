@@ -9,46 +9,86 @@ can be used for a variety of purposes (not just as header guards).
 """
 
 import argparse
+import concurrent.futures
+import functools
+import json
+import mmap
 import os
-import re
 import sys
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import (
+    AbstractSet,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+_IFNDEF = b"#ifndef "
+_DEFINE = b"#define "
+_PRAGMA_ONCE = b"#pragma once"
+# The bytes matched by `\w` and `\s` in a bytes regex.
+_IDENTIFIER_CHARS = b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_"
+_WHITESPACE_BYTES = frozenset(b" \t\n\r\f\v")
+
+_HEADER_EXTENSIONS = (".h", ".hpp", ".hxx")
+_SOURCE_CONTROL_DIRS = frozenset({".git", ".svn", ".hg"})
+
+# Header guards live at the top of a file, so only its prologue is scanned.
+DEFAULT_SCAN_BYTES = 8192
 
 
 def is_header(file_name: str) -> bool:
-    header_extensions = set([".h", ".hpp", ".hxx"])
-    file_extensions = set([x.lower() for x in Path(file_name).suffixes])
-    return len(file_extensions.intersection(header_extensions)) != 0
+    # Try the common lowercase spelling before paying for lower().
+    if file_name.endswith(_HEADER_EXTENSIONS):
+        return True
+    return file_name.lower().endswith(_HEADER_EXTENSIONS)
 
 
-def dirs_to_ignore(ignore_source_control_dirs: bool = True) -> Set[str]:
+def dirs_to_ignore(ignore_source_control_dirs: bool = True) -> FrozenSet[str]:
     if ignore_source_control_dirs:
-        return set([".git", ".svn"])
+        return _SOURCE_CONTROL_DIRS
     else:
-        return set([])
-
-
-# src: https://stackoverflow.com/a/40347279
-def get_sub_dirs_to_search(current_dir: str, dirs_to_ignore: Set[str]) -> List[str]:
-    subfolders = [
-        f.path
-        for f in os.scandir(current_dir)
-        if f.is_dir() and f.name not in dirs_to_ignore
-    ]
-    for current_dir in list(subfolders):
-        subfolders.extend(get_sub_dirs_to_search(current_dir, dirs_to_ignore))
-    return subfolders
-
-
-def find_header_files(dir_to_search: str) -> List[str]:
-    return [
-        f.path for f in os.scandir(dir_to_search) if f.is_file() and is_header(f.name)
-    ]
-
-
-@dataclass
+        return frozenset()
+
+
+def iter_header_files(
+    root: str,
+    dirs_to_ignore: AbstractSet[str],
+    onerror: Optional[Callable[[OSError], None]] = None,
+) -> Iterator[str]:
+    # An explicit worklist instead of os.walk, which recurses through one
+    # generator per directory level before Python 3.12.
+    dirs_to_search = [root]
+    while dirs_to_search:
+        try:
+            entries = os.scandir(dirs_to_search.pop())
+        except OSError as error:
+            # Unreadable directories are skipped and reported to `onerror`,
+            # matching os.walk.
+            if onerror is not None:
+                onerror(error)
+            continue
+        with entries:
+            for entry in entries:
+                # Names are checked first; with follow_symlinks=False the type
+                # comes from the directory listing and no stat() is needed.
+                # Symlinks are skipped, so a linked header is not reported as
+                # a duplicate of its target and linked dirs are not followed.
+                name = entry.name
+                if is_header(name) and entry.is_file(follow_symlinks=False):
+                    yield entry.path
+                elif name not in dirs_to_ignore and entry.is_dir(follow_symlinks=False):
+                    dirs_to_search.append(entry.path)
+
+
+@dataclass(frozen=True, slots=True)
 class HeaderGuardStatus:
     ifndef_name: Optional[str] = None
     def_name: Optional[str] = None
@@ -61,47 +101,128 @@ class HeaderGuardStatus:
         return None
 
 
-def get_header_guard_status(data: str) -> Optional[HeaderGuardStatus]:
-    # https://regex101.com/r/KKcUWF/2
-    re_header_guard_name = re.compile(r"#ifndef (\w+)\s?.*\n#define")
-    header_guard_tag_result = re.search(re_header_guard_name, data)
-    if not header_guard_tag_result:
-        return None
-    header_guard_tag = header_guard_tag_result.group(1)
-    re_define = re.compile(f"#ifndef {header_guard_tag}\\s?.*\\n#define (\\w+)")
-    define_tag_result = re.search(re_define, data)
-    define_tag = define_tag_result.group(1) if define_tag_result else ""
-    return HeaderGuardStatus(
-        ifndef_name=header_guard_tag,
-        def_name=define_tag,
-    )
+# Either the bytes of a header or a read-only mapping of it.
+HeaderData = Union[bytes, mmap.mmap]
 
 
-def uses_pragma_once(data: str) -> bool:
-    # https://regex101.com/r/yBPzdj/2
-    re_pragma_once = re.compile(r"^#pragma once\s?\n")
-    pragma_once = re.match(re_pragma_once, data)
-    return True if pragma_once else False
+def skip_bytes(data: HeaderData, pos: int, end: int, skip: FrozenSet[int]) -> int:
+    while pos < end and data[pos] in skip:
+        pos += 1
+    return pos
 
 
-@dataclass
+def identifier_length(line: bytes) -> int:
+    # lstrip() walks the identifier in C rather than one byte per iteration.
+    return len(line) - len(line.lstrip(_IDENTIFIER_CHARS))
+
+
+def find_line_break(data: HeaderData, pos: int, end: int) -> Tuple[int, int]:
+    """
+    Find the next line break at or after `pos`.
+
+    Headers are read in binary mode, so `\r\n` and a lone `\r` are treated as
+    line breaks too, like text mode's universal newlines did. Returns the
+    position and length of the break, or `(-1, 0)` if there is none.
+    """
+    lf = data.find(b"\n", pos, end)
+    cr = data.find(b"\r", pos, end if lf == -1 else lf)
+    if cr == -1:
+        return (lf, 1) if lf != -1 else (-1, 0)
+    return (cr, 2) if cr + 1 == lf else (cr, 1)
+
+
+def match_define(data: HeaderData, pos: int, end: int) -> Optional[str]:
+    pos = skip_bytes(data, pos, end, _WHITESPACE_BYTES)
+    line_end, _ = find_line_break(data, pos, end)
+    line = data[pos : end if line_end == -1 else line_end]
+    if not line.startswith(_DEFINE):
+        return None
+    name = line[len(_DEFINE) :]
+    name_length = identifier_length(name)
+    if not name_length:
+        return None
+    return name[:name_length].decode("ascii")
+
+
+def match_header_guard(
+    data: HeaderData, pos: int, end: int
+) -> Optional[HeaderGuardStatus]:
+    line_end, break_length = find_line_break(data, pos, end)
+    if line_end == -1:
+        return None
+    line = data[pos:line_end]
+    name_length = identifier_length(line)
+    if not name_length:
+        return None
+    # The #define follows the end of the #ifndef line. Like the regex this
+    # replaces (`#ifndef (\w+)\s?[^\n]*\n\s*#define (\w+)`), a line break
+    # directly after the name lets one extra line sit in between.
+    next_lines = [line_end + break_length]
+    if name_length == len(line):
+        extra_end, extra_length = find_line_break(data, next_lines[0], end)
+        if extra_end != -1:
+            next_lines.append(extra_end + extra_length)
+    for next_line in next_lines:
+        def_name = match_define(data, next_line, end)
+        if def_name is not None:
+            return HeaderGuardStatus(
+                ifndef_name=line[:name_length].decode("ascii"),
+                def_name=def_name,
+            )
+    return None
+
+
+def get_header_guard_status(
+    data: HeaderData, end: Optional[int] = None
+) -> Optional[HeaderGuardStatus]:
+    if end is None:
+        end = len(data)
+    pos = data.find(_IFNDEF, 0, end)
+    while pos != -1:
+        status = match_header_guard(data, pos + len(_IFNDEF), end)
+        if status:
+            return status
+        pos = data.find(_IFNDEF, pos + 1, end)
+    return None
+
+
+def is_at_line_start(data: HeaderData, pos: int) -> bool:
+    line_start = max(data.rfind(b"\n", 0, pos), data.rfind(b"\r", 0, pos)) + 1
+    return not data[line_start:pos].strip(b" \t")
+
+
+def uses_pragma_once(data: HeaderData, end: Optional[int] = None) -> bool:
+    # The directive may follow a license banner or other comments, so look for
+    # it anywhere in the scanned prologue, but only at the start of a line.
+    if end is None:
+        end = len(data)
+    pos = data.find(_PRAGMA_ONCE, 0, end)
+    while pos != -1:
+        after = pos + len(_PRAGMA_ONCE)
+        if data[after : min(after + 1, end)] in (b"\n", b"\r", b" ", b"\t", b""):
+            if is_at_line_start(data, pos):
+                return True
+        pos = data.find(_PRAGMA_ONCE, pos + 1, end)
+    return False
+
+
+@dataclass(frozen=True, slots=True)
 class HeaderStatus:
     file_path: str
     header_guard_status: Optional[HeaderGuardStatus] = None
     uses_pragma_once: bool = False
 
 
-def check_header(file_path: str) -> HeaderStatus:
-    with open(file_path, "r", errors="ignore") as file:
-        data = file.read()
-
-    if uses_pragma_once(data):
+def get_header_status(
+    file_path: str, data: HeaderData, end: Optional[int] = None
+) -> HeaderStatus:
+    if uses_pragma_once(data, end):
         return HeaderStatus(
             file_path=file_path,
             header_guard_status=None,
             uses_pragma_once=True,
         )
-    status = get_header_guard_status(data)
+    status = get_header_guard_status(data, end)
     if status:
         return HeaderStatus(
             file_path=file_path,
@@ -116,21 +237,52 @@ def check_header(file_path: str) -> HeaderStatus:
     )
 
 
-def map_guard_tag_to_filepaths(statuses: List[HeaderStatus]) -> Dict[str, List[str]]:
-    ret: Dict[str, List[str]] = {}
+def check_header(file_path: str, scan_bytes: int = DEFAULT_SCAN_BYTES) -> HeaderStatus:
+    with open(file_path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size <= mmap.PAGESIZE:
+            # Mapping a single page costs more than copying it with read().
+            return get_header_status(file_path, file.read(scan_bytes))
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return get_header_status(file_path, mapped, min(size, scan_bytes))
 
-    for status in statuses:
-        if not status.header_guard_status:
-            raise ValueError(f"{status} does not have a header_guard_status")
-        if not status.header_guard_status.ifndef_name:
-            raise ValueError(f"{status} does not have a ifndef tag")
-        tag = status.header_guard_status.ifndef_name
-        if tag not in ret:
-            ret[tag] = []
 
-        ret[tag].append(status.file_path)
+@dataclass
+class HeaderStatuses:
+    """
+    The results of checking many headers, stored as parallel lists.
+
+    Index `i` of every list describes the same header. Keeping the columns
+    separate lets the filtering and grouping passes walk flat lists instead of
+    chasing a `HeaderStatus` per header.
+    """
 
-    return ret
+    file_paths: List[str] = field(default_factory=list)
+    guard_names: List[Optional[str]] = field(default_factory=list)
+    uses_pragma_once: List[bool] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.file_paths)
+
+    def append(self, status: HeaderStatus) -> None:
+        guard_status = status.header_guard_status
+        self.file_paths.append(status.file_path)
+        self.guard_names.append(guard_status.ifndef_name if guard_status else None)
+        self.uses_pragma_once.append(status.uses_pragma_once)
+
+
+def map_guard_tag_to_filepaths(
+    file_paths: List[str],
+    guard_names: List[Optional[str]],
+    tags: Optional[AbstractSet[str]] = None,
+) -> Dict[str, List[str]]:
+    ret: Dict[str, List[str]] = defaultdict(list)
+
+    for file_path, guard_name in zip(file_paths, guard_names):
+        if guard_name is not None and (tags is None or guard_name in tags):
+            ret[guard_name].append(file_path)
+
+    return dict(ret)
 
 
 TagToFilePaths = Tuple[str, List[str]]
@@ -139,18 +291,23 @@ TagToFilePaths = Tuple[str, List[str]]
 @dataclass
 class DuplicateHeadersReport:
     number_of_unique_tags: int = 0
-    duplicated_tags_info: List[TagToFilePaths] = []
+    duplicated_tags_info: List[TagToFilePaths] = field(default_factory=list)
 
 
 def find_duplicate_header_guards(
-    header_statuses: List[HeaderStatus],
+    header_statuses: HeaderStatuses,
 ) -> DuplicateHeadersReport:
     ret = DuplicateHeadersReport()
-    guard_tags_to_filepaths = map_guard_tag_to_filepaths(header_statuses)
-    ret.number_of_unique_tags = len(guard_tags_to_filepaths)
-    ret.duplicated_tags_info = [
-        (tag, paths) for tag, paths in guard_tags_to_filepaths.items() if len(paths) > 1
-    ]
+    # Counter tallies in C, so paths only need collecting for repeated tags.
+    tag_counts = Counter(filter(None, header_statuses.guard_names))
+    ret.number_of_unique_tags = len(tag_counts)
+    duplicated_tags = {tag for tag, count in tag_counts.items() if count > 1}
+    if not duplicated_tags:
+        return ret
+    guard_tags_to_filepaths = map_guard_tag_to_filepaths(
+        header_statuses.file_paths, header_statuses.guard_names, duplicated_tags
+    )
+    ret.duplicated_tags_info = list(guard_tags_to_filepaths.items())
     return ret
 
 
@@ -166,53 +323,226 @@ def parse_duplicate_headers_report(report: DuplicateHeadersReport) -> None:
             print(f"\t{file}")
 
 
-def process_dir(root: str) -> Optional[str]:
+def default_jobs(use_processes: bool = False) -> int:
+    cpu_count = os.cpu_count() or 1
+    if use_processes:
+        # Processes are only worth it for CPU-bound scanning; one per core.
+        return cpu_count
+    # Scanning is dominated by open()/read(), which release the GIL.
+    return min(32, cpu_count * 4)
+
+
+def scan_headers(
+    headers: Iterable[str], jobs: int, use_processes: bool, scan_bytes: int
+) -> List[HeaderStatus]:
+    # Executor.map submits work as it pulls from `headers`, so when that is a
+    # lazy directory walk, reading headers overlaps with listing directories.
+    executor_type = (
+        concurrent.futures.ProcessPoolExecutor
+        if use_processes
+        else concurrent.futures.ThreadPoolExecutor
+    )
+    with executor_type(max_workers=jobs or default_jobs(use_processes)) as executor:
+        return list(
+            executor.map(
+                functools.partial(check_header, scan_bytes=scan_bytes),
+                headers,
+                chunksize=64,
+            )
+        )
+
+
+# Stored as JSON, so a cache restored from elsewhere is only ever parsed as data.
+# Bump HEADER_CACHE_VERSION whenever the scanning rules change, so results from
+# an older version of this script are discarded instead of reused.
+HEADER_CACHE_VERSION = 1
+CachedHeaderStatus = Tuple[Optional[str], Optional[str], bool]
+HeaderCache = Dict[str, CachedHeaderStatus]
+
+
+def is_cached_status(value: object) -> bool:
+    if not isinstance(value, list) or len(value) != 3:
+        return False
+    ifndef_name, def_name, uses_pragma_once = value
+    return (
+        isinstance(ifndef_name, (str, type(None)))
+        and isinstance(def_name, (str, type(None)))
+        and isinstance(uses_pragma_once, bool)
+    )
+
+
+def load_header_cache(cache_path: str) -> HeaderCache:
+    try:
+        with open(cache_path, "r", encoding="utf-8") as file:
+            cache = json.load(file)
+    except (OSError, ValueError):
+        # A missing or corrupt cache only means every header is rescanned.
+        return {}
+    if not isinstance(cache, dict) or cache.get("version") != HEADER_CACHE_VERSION:
+        return {}
+    entries = cache.get("entries")
+    if not isinstance(entries, dict):
+        return {}
+    return {
+        key: (value[0], value[1], value[2])
+        for key, value in entries.items()
+        if is_cached_status(value)
+    }
+
+
+def save_header_cache(cache_path: str, cache: HeaderCache) -> None:
+    try:
+        with open(cache_path, "w", encoding="utf-8") as file:
+            json.dump({"version": HEADER_CACHE_VERSION, "entries": cache}, file)
+    except OSError as error:
+        # The scan itself succeeded; losing the cache only slows the next run.
+        print(f"Could not write cache {cache_path}: {error}", file=sys.stderr)
+
+
+def header_cache_key(file_path: str, scan_bytes: int) -> Optional[str]:
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return f"{file_path}:{stat.st_mtime_ns}:{stat.st_size}:{scan_bytes}"
+
+
+def to_cached_status(status: HeaderStatus) -> CachedHeaderStatus:
+    guard_status = status.header_guard_status
+    if guard_status:
+        return (guard_status.ifndef_name, guard_status.def_name, False)
+    return (None, None, status.uses_pragma_once)
+
+
+def from_cached_status(file_path: str, cached: CachedHeaderStatus) -> HeaderStatus:
+    ifndef_name, def_name, uses_pragma_once = cached
+    return HeaderStatus(
+        file_path=file_path,
+        header_guard_status=(
+            HeaderGuardStatus(ifndef_name=ifndef_name, def_name=def_name)
+            if ifndef_name
+            else None
+        ),
+        uses_pragma_once=uses_pragma_once,
+    )
+
+
+def scan_headers_cached(
+    headers: Iterable[str],
+    jobs: int,
+    use_processes: bool,
+    scan_bytes: int,
+    cache_path: str,
+) -> List[HeaderStatus]:
+    headers = list(headers)
+    old_cache = load_header_cache(cache_path)
+    new_cache: HeaderCache = {}
+    keys = [header_cache_key(header, scan_bytes) for header in headers]
+    statuses: List[Optional[HeaderStatus]] = []
+    misses: List[int] = []
+    for header, key in zip(headers, keys):
+        cached = old_cache.get(key) if key else None
+        if key and cached:
+            new_cache[key] = cached
+            statuses.append(from_cached_status(header, cached))
+        else:
+            misses.append(len(statuses))
+            statuses.append(None)
+
+    scanned = scan_headers(
+        [headers[i] for i in misses], jobs, use_processes, scan_bytes
+    )
+    for i, status in zip(misses, scanned):
+        statuses[i] = status
+        key = keys[i]
+        if key:
+            new_cache[key] = to_cached_status(status)
+
+    # Only this run's entries are kept, so changed or deleted headers drop out.
+    save_header_cache(cache_path, new_cache)
+    return [status for status in statuses if status]
+
+
+def check_headers(
+    headers: Iterable[str],
+    jobs: int = 0,
+    use_processes: bool = False,
+    scan_bytes: int = DEFAULT_SCAN_BYTES,
+    cache_path: Optional[str] = None,
+) -> HeaderStatuses:
+    if cache_path:
+        statuses = scan_headers_cached(
+            headers, jobs, use_processes, scan_bytes, cache_path
+        )
+    else:
+        statuses = scan_headers(headers, jobs, use_processes, scan_bytes)
+
+    header_statuses = HeaderStatuses()
+    for status in statuses:
+        header_statuses.append(status)
+    return header_statuses
+
+
+def process_dir(
+    root: str,
+    jobs: int = 0,
+    use_processes: bool = False,
+    scan_bytes: int = DEFAULT_SCAN_BYTES,
+    cache_path: Optional[str] = None,
+    ignore_dirs: Optional[AbstractSet[str]] = None,
+) -> Optional[str]:
     """
     Inspect all the headers in the provided dir and its subfolders.
 
     This method checks to see if every "header-like" file (see `is_header`) has
     some form of de-duplication protection and further attempts to find other
     possibly duplicated header guards in the provided directory and
-    sub-directory structure.
+    sub-directory structure. When `cache_path` is given, results for headers
+    whose path, size and modification time are unchanged since the last run
+    are reused from that file instead of being rescanned. Directories named in
+    `ignore_dirs` are skipped; it defaults to `dirs_to_ignore()`. Directories
+    that cannot be read are reported and count as errors, since the headers in
+    them were never checked.
     """
-    ignore_dirs = dirs_to_ignore()
-    sub_dirs = get_sub_dirs_to_search(root, ignore_dirs)
-    headers: List[str] = []
-    for dir in sub_dirs:
-        headers.extend(find_header_files(dir))
-    print(f"Number of header files found: {len(headers)}")
-
-    header_statuses: List[HeaderStatus] = []
-    for header in headers:
-        header_statuses.append(check_header(header))
+    if ignore_dirs is None:
+        ignore_dirs = dirs_to_ignore()
+    unreadable_dirs: List[OSError] = []
+    headers = iter_header_files(root, ignore_dirs, unreadable_dirs.append)
+    header_statuses = check_headers(
+        headers, jobs, use_processes, scan_bytes, cache_path
+    )
 
     print(f"Number of header files processed: {len(header_statuses)}")
+    for error in unreadable_dirs:
+        print(f"Could not read directory {error.filename}: {error}", file=sys.stderr)
 
     no_header_duplication_protection = [
-        s
-        for s in header_statuses
-        if not s.header_guard_status and not s.uses_pragma_once
+        file_path
+        for file_path, guard_name, uses_pragma_once in zip(
+            header_statuses.file_paths,
+            header_statuses.guard_names,
+            header_statuses.uses_pragma_once,
+        )
+        if guard_name is None and not uses_pragma_once
     ]
     print(
         f"Number of header files without protection: {len(no_header_duplication_protection)}"
     )
-    for status in no_header_duplication_protection:
-        print(f"\t{status.file_path}")
+    for file_path in no_header_duplication_protection:
+        print(f"\t{file_path}")
     no_header_protection_found = len(no_header_duplication_protection) > 0
 
-    include_guards = [s for s in header_statuses if s.header_guard_status]
-
-    header_guards_report = find_duplicate_header_guards(include_guards)
+    header_guards_report = find_duplicate_header_guards(header_statuses)
     duplicated_headers_found = len(header_guards_report.duplicated_tags_info) > 0
     parse_duplicate_headers_report(header_guards_report)
 
-    if no_header_protection_found or duplicated_headers_found:
+    if no_header_protection_found or duplicated_headers_found or unreadable_dirs:
         return "Errors found"
     else:
         return None
 
 
-def process_file(file_path: str) -> Optional[str]:
+def process_file(file_path: str, scan_bytes: int = DEFAULT_SCAN_BYTES) -> Optional[str]:
     """
     Inspect a single header file.
 
@@ -220,7 +550,7 @@ def process_file(file_path: str) -> Optional[str]:
     protection. This method only looks at a single file and therefor cannot
     tell the user if include guards have been repeated somewhere else.
     """
-    status = check_header(file_path)
+    status = check_header(file_path, scan_bytes)
     if not status.uses_pragma_once and not status.header_guard_status:
         return f"{status.file_path} does not have any header duplication protection."
     if status.uses_pragma_once:
@@ -237,6 +567,69 @@ def process_file(file_path: str) -> Optional[str]:
         raise RuntimeError("Should not get here")
 
 
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be greater than 0, got {number}")
+    return number
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {number}")
+    return number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--root",
+        help="Directory to inspect (default: the current working directory)",
+    )
+    parser.add_argument(
+        "--ignore-dir",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="Also skip directories with this name (can be repeated)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=non_negative_int,
+        default=0,
+        help="Number of workers used to check headers (default: auto)",
+    )
+    parser.add_argument(
+        "--use-processes",
+        action="store_true",
+        help="Check headers in worker processes instead of threads",
+    )
+    parser.add_argument(
+        "--scan-bytes",
+        type=positive_int,
+        default=DEFAULT_SCAN_BYTES,
+        help="Number of bytes read from the top of each header (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--cache",
+        metavar="FILE",
+        help="Reuse results for unchanged headers across runs via this file",
+    )
+    args = parser.parse_args(argv)
+    root = args.root or os.getcwd()
+    if not os.path.isdir(root):
+        parser.error(f"--root: not a directory: {root}")
+    errors_found = process_dir(
+        root,
+        jobs=args.jobs,
+        use_processes=args.use_processes,
+        scan_bytes=args.scan_bytes,
+        cache_path=args.cache,
+        ignore_dirs=dirs_to_ignore() | set(args.ignore_dir),
+    )
+    return 1 if errors_found else 0
+
+
 if __name__ == "__main__":
-    errors_found = process_dir(os.getcwd())
-    sys.exit(1 if errors_found else 0)
+    sys.exit(main())
@@ -0,0 +1,305 @@
+import contextlib
+import io
+import json
+import os
+import random
+import re
+import tempfile
+import unittest
+
+from find_duplicate_header_guards import (
+    HEADER_CACHE_VERSION,
+    check_headers,
+    dirs_to_ignore,
+    get_header_guard_status,
+    iter_header_files,
+    main,
+    process_dir,
+    uses_pragma_once,
+)
+
+# The pattern get_header_guard_status replaced; the scanner must agree with it.
+_RE_GUARD = re.compile(rb"#ifndef (\w+)\s?[^\n]*\n\s*#define (\w+)")
+
+
+def normalize_newlines(data: bytes) -> bytes:
+    # What reading the header in text mode (universal newlines) used to do.
+    return data.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+
+def regex_guard(data: bytes):
+    match = _RE_GUARD.search(normalize_newlines(data))
+    if not match:
+        return None
+    return (match.group(1).decode("ascii"), match.group(2).decode("ascii"))
+
+
+def scanned_guard(data: bytes, end=None):
+    status = get_header_guard_status(data, end)
+    if not status:
+        return None
+    return (status.ifndef_name, status.def_name)
+
+
+class HeaderGuardStatusTest(unittest.TestCase):
+    def test_guard_cases(self):
+        cases = [
+            (b"#ifndef FOO_H\n#define FOO_H\n#endif\n", ("FOO_H", "FOO_H")),
+            (b"// c\n#ifndef FOO_H  // x\n#define FOO_H\n", ("FOO_H", "FOO_H")),
+            (b"#ifndef BAR_H\n#define BAZ_H\n", ("BAR_H", "BAZ_H")),
+            (b"#ifndef A\n\n  #define A\n", ("A", "A")),
+            (b"#ifndef A\n// c\n#define A\n", ("A", "A")),
+            (b"#ifndef A // x\n// c\n#define A\n", None),
+            (b"#ifndef A\n#ifndef B\n#define B\n", ("A", "B")),
+            (b"#ifndef A\n#define\n", None),
+            (b"#ifndef A", None),
+            (b"int x;\n", None),
+            (b"", None),
+            (b"#ifndef BAR\r\n#define BAR\r\n", ("BAR", "BAR")),
+            (b"#ifndef BAR\r\n// c\r\n#define BAR\r\n", ("BAR", "BAR")),
+            (b"#ifndef Q\r#define Q\r", ("Q", "Q")),
+            (b"#ifndef Q\r// c\r#define Q\r", ("Q", "Q")),
+            (b"#ifndef Q // x\r// c\r#define Q\r", None),
+        ]
+        for data, expected in cases:
+            with self.subTest(data=data):
+                self.assertEqual(scanned_guard(data), expected)
+                self.assertEqual(regex_guard(data), expected)
+
+    def test_end_limits_the_scan(self):
+        data = b"#ifndef FOO_H\n#define FOO_H\n"
+        self.assertEqual(scanned_guard(data, len(data)), ("FOO_H", "FOO_H"))
+        self.assertIsNone(scanned_guard(data, 16))
+
+    def test_matches_regex_on_random_input(self):
+        tokens = [
+            b"#ifndef ",
+            b"#define ",
+            b"A",
+            b"B_1",
+            b"\n",
+            b"\n\n",
+            b"\r",
+            b"\r\n",
+            b" ",
+            b"\t",
+            b"//x",
+            b"#",
+        ]
+        rng = random.Random(0)
+        for _ in range(20000):
+            data = b"".join(rng.choice(tokens) for _ in range(rng.randint(0, 12)))
+            end = rng.randint(0, len(data))
+            with self.subTest(data=data, end=end):
+                self.assertEqual(scanned_guard(data), regex_guard(data))
+                self.assertEqual(scanned_guard(data, end), regex_guard(data[:end]))
+
+
+class UsesPragmaOnceTest(unittest.TestCase):
+    def test_pragma_once_cases(self):
+        cases = [
+            (b"#pragma once\n", True),
+            (b"#pragma once", True),
+            (b"#pragma once\r\n", True),
+            (b"#pragma once\r", True),
+            (b"  #pragma once // x\n", True),
+            (b"#pragma once_not\n", False),
+            (b"// c\n#pragma once\n", True),
+            (b"/* license */\n#pragma once", True),
+            (b"/* license */\r\n  #pragma once\r\n", True),
+            (b"// #pragma once\n", False),
+            (b"int x; #pragma once\n", False),
+            (b"// c\n#pragma once_not\n#pragma onceX\n", False),
+            (b"", False),
+        ]
+        for data, expected in cases:
+            with self.subTest(data=data):
+                self.assertEqual(uses_pragma_once(data), expected)
+
+    def test_end_limits_the_scan(self):
+        self.assertTrue(uses_pragma_once(b"#pragma once\n", 13))
+        self.assertFalse(uses_pragma_once(b"#pragma once\n", 8))
+        self.assertFalse(uses_pragma_once(b"// c\n#pragma once\n", 10))
+
+
+class HeaderCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_path = os.path.join(self.tmp_dir.name, "cache.json")
+
+    def write_header(self, name: str, data: bytes) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def guard_names(self, headers):
+        statuses = check_headers(headers, jobs=1, cache_path=self.cache_path)
+        return statuses.guard_names
+
+    def load_entries(self):
+        with open(self.cache_path, encoding="utf-8") as file:
+            cache = json.load(file)
+        self.assertEqual(cache["version"], HEADER_CACHE_VERSION)
+        return cache["entries"]
+
+    def test_unchanged_header_is_a_cache_hit(self):
+        path = self.write_header("a.h", b"#ifndef AAA\n#define AAA\n")
+        self.assertEqual(self.guard_names([path]), ["AAA"])
+        stat = os.stat(path)
+        # Same size and mtime, so the stale cached result must be returned.
+        self.write_header("a.h", b"#ifndef BBB\n#define BBB\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.guard_names([path]), ["AAA"])
+
+    def test_size_change_invalidates_entry(self):
+        path = self.write_header("a.h", b"#ifndef AAA\n#define AAA\n")
+        self.assertEqual(self.guard_names([path]), ["AAA"])
+        stat = os.stat(path)
+        self.write_header("a.h", b"#ifndef LONGER\n#define LONGER\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self.guard_names([path]), ["LONGER"])
+
+    def test_mtime_change_invalidates_entry(self):
+        path = self.write_header("a.h", b"#ifndef AAA\n#define AAA\n")
+        self.assertEqual(self.guard_names([path]), ["AAA"])
+        stat = os.stat(path)
+        self.write_header("a.h", b"#ifndef BBB\n#define BBB\n")
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        self.assertEqual(self.guard_names([path]), ["BBB"])
+
+    def test_unusable_cache_falls_back_to_full_scan(self):
+        path = self.write_header("a.h", b"#ifndef AAA\n#define AAA\n")
+        self.assertEqual(self.guard_names([path]), ["AAA"])
+        (key,) = self.load_entries()
+        contents = [
+            "not json",
+            json.dumps([1, 2, 3]),
+            json.dumps({key: ["BBB", "BBB", False]}),
+            json.dumps({"version": HEADER_CACHE_VERSION, "entries": []}),
+            json.dumps(
+                {"version": HEADER_CACHE_VERSION, "entries": {key: ["BBB", "BBB"]}}
+            ),
+            json.dumps(
+                {
+                    "version": HEADER_CACHE_VERSION - 1,
+                    "entries": {key: ["BBB", None, 0]},
+                }
+            ),
+            json.dumps(
+                {
+                    "version": HEADER_CACHE_VERSION - 1,
+                    "entries": {key: ["BBB", "BBB", False]},
+                }
+            ),
+        ]
+        for content in contents:
+            with self.subTest(content=content):
+                with open(self.cache_path, "w", encoding="utf-8") as file:
+                    file.write(content)
+                self.assertEqual(self.guard_names([path]), ["AAA"])
+                self.assertEqual(self.load_entries(), {key: ["AAA", "AAA", False]})
+
+    def test_deleted_headers_are_dropped_on_rewrite(self):
+        kept = self.write_header("a.h", b"#pragma once\n")
+        deleted = self.write_header("b.h", b"#pragma once\n")
+        self.guard_names([kept, deleted])
+        self.assertEqual(len(self.load_entries()), 2)
+        os.remove(deleted)
+        self.guard_names([kept])
+        (key,) = self.load_entries()
+        self.assertTrue(key.startswith(kept + ":"))
+
+    def test_unwritable_cache_path_does_not_fail_the_scan(self):
+        path = self.write_header("a.h", b"#ifndef AAA\n#define AAA\n")
+        self.cache_path = os.path.join(self.tmp_dir.name, "missing", "cache.json")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(self.guard_names([path]), ["AAA"])
+        self.assertIn("Could not write cache", stderr.getvalue())
+
+
+class IterHeaderFilesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = self.tmp_dir.name
+
+    def touch(self, *parts: str) -> str:
+        path = os.path.join(self.root, *parts)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        open(path, "wb").close()
+        return path
+
+    def found(self, ignore=None):
+        if ignore is None:
+            ignore = dirs_to_ignore()
+        headers = iter_header_files(self.root, ignore)
+        return sorted(os.path.relpath(path, self.root) for path in headers)
+
+    def test_finds_headers(self):
+        self.touch("root.h")
+        self.touch("src", "a.hpp")
+        self.touch("src", "deep", "b.HPP")
+        self.touch("src", "a.cpp")
+        self.touch("config.h.in")
+        self.assertEqual(
+            self.found(),
+            [
+                "root.h",
+                os.path.join("src", "a.hpp"),
+                os.path.join("src", "deep", "b.HPP"),
+            ],
+        )
+
+    def test_skips_source_control_dirs(self):
+        self.touch("a.h")
+        for name in (".git", ".svn", ".hg"):
+            self.touch(name, "b.h")
+        self.assertEqual(self.found(), ["a.h"])
+        self.assertEqual(len(self.found(frozenset())), 4)
+
+    def test_honours_custom_ignore_dirs(self):
+        self.touch("a.h")
+        self.touch("third_party", "b.h")
+        self.assertEqual(self.found(dirs_to_ignore() | {"third_party"}), ["a.h"])
+
+    def test_skips_symlinks(self):
+        target = self.touch("src", "a.h")
+        try:
+            os.symlink(target, os.path.join(self.root, "link.h"))
+            os.symlink(
+                os.path.dirname(target),
+                os.path.join(self.root, "link_dir"),
+                target_is_directory=True,
+            )
+        except (OSError, NotImplementedError) as error:
+            self.skipTest(f"symlinks unavailable: {error}")
+        self.assertEqual(self.found(), [os.path.join("src", "a.h")])
+
+    def test_reports_unreadable_dirs(self):
+        missing = os.path.join(self.root, "missing")
+        errors = []
+        self.assertEqual(
+            list(iter_header_files(missing, frozenset(), errors.append)), []
+        )
+        self.assertEqual([error.filename for error in errors], [missing])
+
+    def test_unreadable_dirs_fail_process_dir(self):
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            result = process_dir(os.path.join(self.root, "missing"))
+        self.assertEqual(result, "Errors found")
+        self.assertIn("Could not read directory", stderr.getvalue())
+
+    def test_main_rejects_missing_root(self):
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit) as cm:
+            main(["--root", os.path.join(self.root, "missing")])
+        self.assertEqual(cm.exception.code, 2)
+        self.assertIn("not a directory", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()